@@ -4,102 +4,155 @@ Conduit Example App — Python SDK Client
 
 Demonstrates the Python SDK calling the Conduit REST API.
 Exercises the full user journey: register -> login -> create article -> comment -> follow -> favorite.
+Calls with no data dependency between them are issued concurrently.
 """
 
+import asyncio
 import json
 import os
 import sys
-from urllib.request import Request, urlopen
-from urllib.error import HTTPError
+import time
+
+import aiohttp
+
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; stdlib json is the fallback
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
+
+# How long a health() result is reused before the server is asked again
+HEALTH_TTL_SECONDS = 5.0
 
 
 class ConduitClient:
-    """HTTP client for the Conduit Clef REST API."""
+    """Async HTTP client for the Conduit Clef REST API.
+
+    Use as an async context manager (or call close()) so the underlying
+    connection pool is released.
+    """
 
     def __init__(self, base_url: str = None):
         self.base_url = base_url or os.environ.get("CONDUIT_URL", "http://localhost:3000")
         self.token: str | None = None
-
-    def _request(self, method: str, path: str, body: dict = None) -> dict:
+        self._session: aiohttp.ClientSession | None = None
+        self._health_cache: tuple[float, dict] | None = None
+
+    async def __aenter__(self) -> "ConduitClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily so it binds to the running event loop; the session's
+        # keep-alive pool is shared by every call in the journey.
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=10),
+            )
+        return self._session
+
+    async def _request(self, method: str, path: str, body: dict = None) -> dict:
         url = f"{self.base_url}{path}"
-        data = json.dumps(body).encode() if body else None
+        data = _dumps(body) if body else None
         headers = {"Content-Type": "application/json"}
 
         if self.token:
             headers["Authorization"] = f"Token {self.token}"
 
-        req = Request(url, data=data, headers=headers, method=method)
+        async with self._get_session().request(method, url, data=data, headers=headers) as resp:
+            payload = await resp.read()
+            if resp.status >= 400:
+                raise RuntimeError(f"HTTP {resp.status}: {payload.decode()}")
+            return _loads(payload)
 
+    async def ping(self) -> bool:
+        """Check the server is up with a body-less HEAD request."""
         try:
-            with urlopen(req) as resp:
-                return json.loads(resp.read().decode())
-        except HTTPError as e:
-            error_body = e.read().decode()
-            raise RuntimeError(f"HTTP {e.code}: {error_body}") from e
-
-    def health(self) -> dict:
-        return self._request("GET", "/api/health")
+            async with self._get_session().head(f"{self.base_url}/api/health") as resp:
+                return resp.status == 200
+        except aiohttp.ClientError:
+            return False
+
+    async def health(self) -> dict:
+        """Fetch server status, reusing the last result for HEALTH_TTL_SECONDS."""
+        now = time.monotonic()
+        if self._health_cache is not None and now - self._health_cache[0] < HEALTH_TTL_SECONDS:
+            return self._health_cache[1]
+        result = await self._request("GET", "/api/health")
+        self._health_cache = (now, result)
+        return result
 
-    def register(self, username: str, email: str, password: str) -> dict:
-        result = self._request("POST", "/api/users", {
+    async def register(self, username: str, email: str, password: str) -> dict:
+        result = await self._request("POST", "/api/users", {
             "user": {"username": username, "email": email, "password": password}
         })
         if "user" in result and "token" in result["user"]:
             self.token = result["user"]["token"]
         return result
 
-    def login(self, email: str, password: str) -> dict:
-        result = self._request("POST", "/api/users/login", {
+    async def login(self, email: str, password: str) -> dict:
+        result = await self._request("POST", "/api/users/login", {
             "user": {"email": email, "password": password}
         })
         if "user" in result and "token" in result["user"]:
             self.token = result["user"]["token"]
         return result
 
-    def update_profile(self, bio: str = None, image: str = None) -> dict:
+    async def update_profile(self, bio: str = None, image: str = None) -> dict:
         user = {}
         if bio is not None:
             user["bio"] = bio
         if image is not None:
             user["image"] = image
-        return self._request("PUT", "/api/user", {"user": user})
+        return await self._request("PUT", "/api/user", {"user": user})
 
-    def create_article(self, title: str, description: str, body: str, tags: list = None) -> dict:
+    async def create_article(self, title: str, description: str, body: str, tags: list = None) -> dict:
         article = {"title": title, "description": description, "body": body}
         if tags:
             article["tagList"] = tags
-        return self._request("POST", "/api/articles", {"article": article})
+        return await self._request("POST", "/api/articles", {"article": article})
 
-    def delete_article(self, slug: str) -> dict:
-        return self._request("DELETE", f"/api/articles/{slug}")
+    async def delete_article(self, slug: str) -> dict:
+        return await self._request("DELETE", f"/api/articles/{slug}")
 
-    def create_comment(self, slug: str, body: str) -> dict:
-        return self._request("POST", f"/api/articles/{slug}/comments", {
+    async def create_comment(self, slug: str, body: str) -> dict:
+        return await self._request("POST", f"/api/articles/{slug}/comments", {
             "comment": {"body": body}
         })
 
-    def follow(self, username: str) -> dict:
-        return self._request("POST", f"/api/profiles/{username}/follow")
+    async def follow(self, username: str) -> dict:
+        return await self._request("POST", f"/api/profiles/{username}/follow")
 
-    def unfollow(self, username: str) -> dict:
-        return self._request("DELETE", f"/api/profiles/{username}/follow")
+    async def unfollow(self, username: str) -> dict:
+        return await self._request("DELETE", f"/api/profiles/{username}/follow")
 
-    def favorite(self, slug: str) -> dict:
-        return self._request("POST", f"/api/articles/{slug}/favorite")
+    async def favorite(self, slug: str) -> dict:
+        return await self._request("POST", f"/api/articles/{slug}/favorite")
 
-    def unfavorite(self, slug: str) -> dict:
-        return self._request("DELETE", f"/api/articles/{slug}/favorite")
+    async def unfavorite(self, slug: str) -> dict:
+        return await self._request("DELETE", f"/api/articles/{slug}/favorite")
 
 
-def main():
-    client = ConduitClient()
-
+async def run_journey(client: ConduitClient) -> None:
     print("Conduit Python SDK Client")
     print("=========================")
 
     # Health check
     try:
-        health = client.health()
+        health = await client.health()
         print(f"Server: {health['status']} | Concepts: {health['concepts']} | Syncs: {health['syncs']}\n")
     except Exception as e:
         print(f"Server unreachable: {e}")
@@ -108,7 +161,7 @@ def main():
     # Register
     print("1. Registering user...")
     try:
-        result = client.register("python-user", "python@conduit.io", "password123")
+        result = await client.register("python-user", "python@conduit.io", "password123")
         user = result["user"]
         print(f"   Registered: {user['username']} (token: {user['token'][:20]}...)\n")
     except Exception as e:
@@ -118,50 +171,55 @@ def main():
     # Login
     print("2. Logging in...")
     try:
-        result = client.login("python@conduit.io", "password123")
+        result = await client.login("python@conduit.io", "password123")
         print(f"   Logged in: {result['user']['username']}\n")
     except Exception as e:
         print(f"   Failed: {e}\n")
 
-    # Update profile
+    # Update profile and create article — independent once logged in
     print("3. Updating profile...")
-    try:
-        result = client.update_profile(bio="Python developer", image="https://python.org/logo.png")
-        print(f"   Profile updated\n")
-    except Exception as e:
-        print(f"   Failed: {e}\n")
-
-    # Create article
     print("4. Creating article...")
-    try:
-        result = client.create_article(
+    profile, article = await asyncio.gather(
+        client.update_profile(bio="Python developer", image="https://python.org/logo.png"),
+        client.create_article(
             title="Clef from Python",
             description="Using the Python SDK to interact with Clef",
             body="This article was created by the Python SDK client...",
             tags=["python", "clef", "sdk"],
-        )
-        print(f"   Created: {result.get('article', {}).get('title', 'unknown')}\n")
-    except Exception as e:
-        print(f"   Failed: {e}\n")
-
-    # Follow
+        ),
+        return_exceptions=True,
+    )
+    if isinstance(profile, Exception):
+        print(f"   Profile update failed: {profile}")
+    else:
+        print("   Profile updated")
+    if isinstance(article, Exception):
+        print(f"   Article creation failed: {article}\n")
+    else:
+        print(f"   Created: {article.get('article', {}).get('title', 'unknown')}\n")
+
+    # Follow and favorite — independent of each other
     print("5. Following user...")
-    try:
-        client.follow("other-user")
-        print("   Followed!\n")
-    except Exception as e:
-        print(f"   Failed: {e}\n")
-
-    # Favorite
     print("6. Favoriting article...")
-    try:
-        client.favorite("some-article")
-        print("   Favorited!\n")
-    except Exception as e:
-        print(f"   Failed: {e}\n")
+    followed, favorited = await asyncio.gather(
+        client.follow("other-user"),
+        client.favorite("some-article"),
+        return_exceptions=True,
+    )
+    print(f"   Follow failed: {followed}" if isinstance(followed, Exception) else "   Followed!")
+    print(f"   Favorite failed: {favorited}\n" if isinstance(favorited, Exception) else "   Favorited!\n")
 
     print("Python SDK journey complete!")
 
 
+async def amain() -> None:
+    async with ConduitClient() as client:
+        await run_journey(client)
+
+
+def main():
+    asyncio.run(amain())
+
+
 if __name__ == "__main__":
     main()
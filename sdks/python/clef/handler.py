@@ -8,7 +8,16 @@ The dispatch logic routes ActionInvocations to the correct method by name.
 from __future__ import annotations
 
 import inspect
-from typing import Any
+from typing import Any, Callable
+
+# Code flags set on `async def` (and @types.coroutine) function bodies
+_ASYNC_FLAGS = inspect.CO_COROUTINE | inspect.CO_ITERABLE_COROUTINE
+
+
+def _is_async(fn: Any) -> bool:
+    """Cheap stand-in for inspect.iscoroutinefunction on plain functions/methods."""
+    code = getattr(fn, "__code__", None)
+    return code is not None and bool(code.co_flags & _ASYNC_FLAGS)
 
 
 class ConceptHandler:
@@ -16,6 +25,9 @@ class ConceptHandler:
 
     Subclasses implement async methods named after concept actions.
     The handler dispatches invocations to the matching method automatically.
+    Plain async methods are looked up in a table built once per subclass,
+    when the class is defined; any other public async attribute is still
+    dispatched, through a getattr on each call.
 
     Example:
         class PasswordHandler(ConceptHandler):
@@ -31,6 +43,23 @@ class ConceptHandler:
                 return {"variant": "invalid"}
     """
 
+    # action name → unbound async method, built by __init_subclass__
+    _ACTIONS: dict[str, Callable[..., Any]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        actions: dict[str, Callable[..., Any]] = {}
+        for klass in reversed(cls.__mro__):
+            for name, attr in vars(klass).items():
+                if name.startswith("_") or name == "handle":
+                    continue
+                if _is_async(attr):
+                    actions[name] = attr
+                else:
+                    # A sync override hides an inherited async action
+                    actions.pop(name, None)
+        cls._ACTIONS = actions
+
     async def handle(self, action: str, input: dict[str, Any], storage: Any) -> dict[str, Any]:
         """Dispatch an action invocation to the named method.
 
@@ -41,19 +70,23 @@ class ConceptHandler:
 
         Returns:
             A dict with at minimum a "variant" key (the completion variant).
-
-        Raises:
-            AttributeError: If the action method doesn't exist on this handler.
-            TypeError: If the action method is not async.
+            Unknown actions, non-async methods and results without a
+            "variant" key come back as {"variant": "error", "message": ...}
+            rather than raising.
         """
-        method = getattr(self, action, None)
-        if method is None:
-            return {"variant": "error", "message": f"Unknown action: {action}"}
-
-        if not inspect.iscoroutinefunction(method):
-            return {"variant": "error", "message": f"Action '{action}' must be async"}
-
-        result = await method(input, storage)
+        method = self._ACTIONS.get(action)
+        if method is not None:
+            result = await method(self, input, storage)
+        else:
+            # Not in the class-definition table: methods added later by a
+            # class decorator or setattr, static/class methods, and
+            # instance attributes are resolved the slow way
+            attr = getattr(self, action, None)
+            if attr is None or action.startswith("_") or action == "handle":
+                return {"variant": "error", "message": f"Unknown action: {action}"}
+            if not _is_async(attr):
+                return {"variant": "error", "message": f"Action '{action}' must be async"}
+            result = await attr(input, storage)
 
         # Ensure result has a variant
         if not isinstance(result, dict) or "variant" not in result:
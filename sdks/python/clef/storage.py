@@ -7,7 +7,7 @@ This matches the TypeScript ConceptStorage interface (Section 6.8).
 
 from __future__ import annotations
 
-import time
+import itertools
 from typing import Any, Protocol
 
 
@@ -33,48 +33,158 @@ class ConceptStorage(Protocol):
         ...
 
 
+_NO_KEYS: dict[str, None] = {}  # shared empty bucket; never mutated
+_MISSING = object()
+
+
 class InMemoryStorage:
     """In-memory ConceptStorage implementation for testing and development.
 
-    Data is organized as: relations[relation_name][key] = {value, meta}
+    Data is organized as: relations[relation_name][key] = value
+
+    Every hashable field value is also indexed as
+    indexes[relation_name][field][value] = {key: None}, so find() with
+    filter args intersects key buckets instead of scanning the whole
+    relation. The (field, value) pairs indexed for each key are
+    snapshotted at put() time, so a value edited in place and put() back
+    is re-indexed correctly.
+    The async ConceptStorage methods wrap *_sync variants that callers
+    holding an InMemoryStorage may use directly, skipping the coroutine.
+    find() returns entries in the order their keys were first stored,
+    filtered or not.
     """
 
     def __init__(self) -> None:
         self._relations: dict[str, dict[str, dict[str, Any]]] = {}
+        self._indexes: dict[str, dict[str, dict[Any, dict[str, None]]]] = {}
+        # relation → key → (field, value) pairs currently in _indexes
+        self._indexed: dict[str, dict[str, tuple[tuple[str, Any], ...]]] = {}
+        # relation → key → sequence number of its first put(), which is
+        # the key's position in the relation dict
+        self._order: dict[str, dict[str, int]] = {}
+        self._sequence = itertools.count()
 
     def _ensure_relation(self, relation: str) -> dict[str, dict[str, Any]]:
         if relation not in self._relations:
             self._relations[relation] = {}
         return self._relations[relation]
 
+    def _index_add(self, relation: str, key: str, value: dict[str, Any]) -> None:
+        fields = self._indexes.setdefault(relation, {})
+        indexed: list[tuple[str, Any]] = []
+        for field, v in value.items():
+            try:
+                fields.setdefault(field, {}).setdefault(v, {})[key] = None
+            except TypeError:
+                continue  # unhashable values are only reachable by scan
+            indexed.append((field, v))
+        self._indexed.setdefault(relation, {})[key] = tuple(indexed)
+
+    def _index_remove(self, relation: str, key: str) -> None:
+        # Works from the put()-time snapshot, not the stored dict, which
+        # the caller may have edited in place since
+        indexed = self._indexed.get(relation, {}).pop(key, ())
+        fields = self._indexes.get(relation)
+        for field, v in indexed:
+            by_value = fields[field]
+            keys = by_value[v]
+            del keys[key]
+            if not keys:
+                del by_value[v]
+
+    # ConceptStorage protocol: async facades over the synchronous core
+
     async def get(self, relation: str, key: str) -> dict[str, Any] | None:
-        rel = self._ensure_relation(relation)
-        entry = rel.get(key)
-        return entry["value"] if entry else None
+        return self.get_sync(relation, key)
 
     async def put(self, relation: str, key: str, value: dict[str, Any]) -> None:
-        rel = self._ensure_relation(relation)
-        rel[key] = {
-            "value": value,
-            "meta": {"lastWrittenAt": time.time()},
-        }
+        self.put_sync(relation, key, value)
 
     async def delete(self, relation: str, key: str) -> bool:
+        return self.delete_sync(relation, key)
+
+    async def find(
+        self, relation: str, args: dict[str, Any] | None = None
+    ) -> list[dict[str, Any]]:
+        return self.find_sync(relation, args)
+
+    # Synchronous core, usable directly by code that knows it holds an
+    # InMemoryStorage
+
+    def get_sync(self, relation: str, key: str) -> dict[str, Any] | None:
+        rel = self._ensure_relation(relation)
+        return rel.get(key)
+
+    def put_sync(self, relation: str, key: str, value: dict[str, Any]) -> None:
         rel = self._ensure_relation(relation)
         if key in rel:
-            del rel[key]
-            return True
-        return False
+            self._index_remove(relation, key)
+        else:
+            self._order.setdefault(relation, {})[key] = next(self._sequence)
+        rel[key] = value
+        self._index_add(relation, key, value)
 
-    async def find(
+    def delete_sync(self, relation: str, key: str) -> bool:
+        rel = self._ensure_relation(relation)
+        if rel.pop(key, _MISSING) is _MISSING:
+            return False
+        self._index_remove(relation, key)
+        del self._order[relation][key]
+        return True
+
+    def find_sync(
         self, relation: str, args: dict[str, Any] | None = None
     ) -> list[dict[str, Any]]:
         rel = self._ensure_relation(relation)
-        results = [entry["value"] for entry in rel.values()]
-        if args:
-            results = [
-                r
-                for r in results
-                if all(r.get(k) == v for k, v in args.items())
-            ]
-        return results
+        if not args:
+            return list(rel.values())
+
+        fields = self._indexes.get(relation, {})
+        candidates: list[dict[str, None]] = []
+        for field, want in args.items():
+            # A None filter also matches entries missing the field, which
+            # the index cannot answer; unhashable values are never indexed.
+            if want is None:
+                return self._scan(rel, args)
+            try:
+                keys = fields.get(field, {}).get(want, _NO_KEYS)
+            except TypeError:
+                return self._scan(rel, args)
+            if not keys:
+                return []
+            candidates.append(keys)
+
+        # Walk the most selective bucket and probe the others
+        candidates.sort(key=len)
+        smallest, others = candidates[0], candidates[1:]
+        matched: list[str] = []
+        append = matched.append
+        for k in smallest:
+            for keys in others:
+                if k not in keys:
+                    break
+            else:
+                append(k)
+
+        # Buckets are ordered by when a key entered them, which differs from
+        # relation order once a key is overwritten with a new field value;
+        # the sort is near-linear on the usual already-ordered input
+        matched.sort(key=self._order[relation].__getitem__)
+        return [rel[k] for k in matched]
+
+    @staticmethod
+    def _scan(
+        rel: dict[str, dict[str, Any]], args: dict[str, Any]
+    ) -> list[dict[str, Any]]:
+        # Single pass, bailing out on the first mismatching field
+        items = args.items()
+        out: list[dict[str, Any]] = []
+        append = out.append
+        for value in rel.values():
+            for k, want in items:
+                if value.get(k) != want:
+                    break
+            else:
+                append(value)
+        return out
+
@@ -2,16 +2,20 @@
 HTTP transport server for Clef concept handlers.
 
 Starts an HTTP server that speaks the Clef wire protocol:
-  POST /invoke → ActionInvocation → handler → ActionCompletion
+  POST /invoke       → ActionInvocation → handler → ActionCompletion
+  POST /invoke-batch → [ActionInvocation, ...] → [ActionCompletion, ...]
   POST /query  → ConceptQuery → storage.find → results
   GET  /health → {"healthy": true, "latencyMs": 0}
 
 Uses aiohttp for async HTTP. Falls back to built-in http.server if aiohttp
-is not installed (sync mode, for simple testing).
+is not installed (sync mode, for simple testing). JSON goes through orjson
+when it is installed, stdlib json otherwise; with msgspec installed,
+invocations decode straight into a typed Invocation struct.
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import time
 import uuid
@@ -20,41 +24,158 @@ from typing import Any
 from clef.registry import _REGISTRY
 from clef.storage import InMemoryStorage
 
+try:
+    import orjson
 
-async def _handle_invoke(body: dict[str, Any]) -> dict[str, Any]:
-    """Process an ActionInvocation and return an ActionCompletion."""
-    concept_uri = body.get("concept", "")
-    action = body.get("action", "")
-    input_data = body.get("input", {})
-    flow = body.get("flow", str(uuid.uuid4()))
-    invocation_id = body.get("id", str(uuid.uuid4()))
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; stdlib json is the fallback
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
+try:
+    import msgspec
+except ImportError:  # msgspec is optional; invocations decode via _loads
+    msgspec = None
+
+
+def _new_id() -> str:
+    """Mint a flow/invocation id; only called when the client sent none."""
+    return str(uuid.uuid4())
+
+
+if msgspec is not None:
+
+    class Invocation(msgspec.Struct):
+        """ActionInvocation as it arrives on the wire.
+
+        Fields are untyped so the struct accepts exactly what the dict path
+        does (null, numeric ids, ...); _invoke_decoded fills in missing
+        input, flow and id the same way _handle_invoke does.
+        """
+
+        concept: Any = ""
+        action: Any = ""
+        input: Any = None
+        flow: Any = None
+        id: Any = None
+
+    _INVOCATION_DECODER = msgspec.json.Decoder(Invocation)
+    _INVOCATION_LIST_DECODER = msgspec.json.Decoder(list[Invocation])
+else:
+    _INVOCATION_DECODER = None
+    _INVOCATION_LIST_DECODER = None
 
+
+# Query results longer than this are streamed instead of buffered
+_STREAM_MIN_ROWS = 100
+# Rows serialized per write while streaming
+_STREAM_CHUNK_ROWS = 256
+# Responses at least this large are gzip/deflate-compressed when accepted
+_COMPRESS_MIN_BYTES = 512
+
+# (epoch second, formatted ISO-8601 timestamp) for _iso_now
+_TS_CACHE: tuple[int, str] = (0, "")
+
+
+def _iso_now() -> str:
+    """Return the current UTC time as ISO-8601, formatting at most once per second."""
+    global _TS_CACHE
+    now = int(time.time())
+    cached_at, formatted = _TS_CACHE
+    if cached_at != now:
+        formatted = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+        _TS_CACHE = (now, formatted)
+    return formatted
+
+
+async def _handle_invoke(body: dict[str, Any], catch_errors: bool = False) -> dict[str, Any]:
+    """Process an ActionInvocation and return an ActionCompletion."""
+    return await _invoke(
+        body.get("concept", ""),
+        body.get("action", ""),
+        body.get("input") or {},
+        body.get("flow") or _new_id(),
+        body.get("id") or _new_id(),
+        catch_errors,
+    )
+
+
+async def _handle_invoke_raw(raw: bytes) -> dict[str, Any]:
+    """Decode a JSON-encoded ActionInvocation and process it."""
+    if not raw:
+        return await _handle_invoke({})
+    if _INVOCATION_DECODER is None:
+        return await _handle_invoke(_loads(raw))
+    return await _invoke_decoded(_INVOCATION_DECODER.decode(raw))
+
+
+async def _invoke_decoded(inv: Any, catch_errors: bool = False) -> dict[str, Any]:
+    """Process an Invocation struct, normalized the same way as _handle_invoke."""
+    return await _invoke(
+        inv.concept,
+        inv.action,
+        inv.input or {},
+        inv.flow or _new_id(),
+        inv.id or _new_id(),
+        catch_errors,
+    )
+
+
+async def _handle_invoke_batch_raw(raw: bytes) -> list[dict[str, Any]]:
+    """Decode a JSON array of ActionInvocations and process them concurrently.
+
+    Completions are returned in the same order as the invocations. A handler
+    that raises yields an error completion in its own slot rather than
+    failing the whole batch, so the caller can see which invocations ran.
+    """
+    if not raw:
+        return []
+    if _INVOCATION_LIST_DECODER is None:
+        return list(await asyncio.gather(*(
+            _handle_invoke(body, catch_errors=True) for body in _loads(raw)
+        )))
+    invocations = _INVOCATION_LIST_DECODER.decode(raw)
+    return list(await asyncio.gather(*(
+        _invoke_decoded(inv, catch_errors=True) for inv in invocations
+    )))
+
+
+async def _invoke(
+    concept_uri: str,
+    action: str,
+    input_data: dict[str, Any],
+    flow: str,
+    invocation_id: str,
+    catch_errors: bool = False,
+) -> dict[str, Any]:
     entry = _REGISTRY.get(concept_uri)
     if entry is None:
-        return {
-            "id": invocation_id,
-            "concept": concept_uri,
-            "action": action,
-            "input": input_data,
-            "variant": "error",
-            "output": {"variant": "error", "message": f"Unknown concept: {concept_uri}"},
-            "flow": flow,
-            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-        }
-
-    handler, storage = entry
-    result = await handler.handle(action, input_data, storage)
-    variant = result.get("variant", "ok")
-
+        variant = "error"
+        output = {"variant": "error", "message": f"Unknown concept: {concept_uri}"}
+    else:
+        handler, storage = entry
+        try:
+            output = await handler.handle(action, input_data, storage)
+        except Exception as exc:
+            if not catch_errors:
+                raise
+            output = {"variant": "error", "message": f"Action '{action}' raised {type(exc).__name__}: {exc}"}
+        variant = output.get("variant", "ok")
+
+    # One constant-key literal for both outcomes: CPython builds it with a
+    # single BUILD_CONST_KEY_MAP, which beats dict(zip(keys, values))
     return {
         "id": invocation_id,
         "concept": concept_uri,
         "action": action,
         "input": input_data,
         "variant": variant,
-        "output": result,
+        "output": output,
         "flow": flow,
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "timestamp": _iso_now(),
     }
 
 
@@ -78,9 +199,13 @@ def serve(host: str = "0.0.0.0", port: int = 8090) -> None:
     Serves all registered concept handlers on the given host:port.
 
     Routes:
-        POST /invoke → ActionInvocation handling
-        POST /query  → State queries
-        GET  /health → Health check
+        POST /invoke       → ActionInvocation handling
+        POST /invoke-batch → Concurrent handling of an ActionInvocation array
+        POST /query        → State queries
+        GET  /health       → Health check
+
+    Large query results are streamed as a chunked JSON array, and larger
+    responses are compressed when the client sends Accept-Encoding.
     """
     try:
         from aiohttp import web
@@ -88,52 +213,103 @@ def serve(host: str = "0.0.0.0", port: int = 8090) -> None:
         _serve_stdlib(host, port)
         return
 
+    app = _create_app()
+
+    registered = list(_REGISTRY.keys())
+    print(f"Clef Python SDK v0.1.0")
+    print(f"Serving {len(registered)} concept(s) on {host}:{port}")
+    for uri in registered:
+        print(f"  - {uri}")
+
+    web.run_app(app, host=host, port=port)
+
+
+def _create_app() -> Any:
+    """Build the aiohttp application behind serve(). Requires aiohttp."""
+    from aiohttp import web
+
+    def json_response(data: Any, status: int = 200) -> web.Response:
+        # Encodes straight to bytes, unlike web.json_response, whose
+        # dumps= hook must return str
+        payload = _dumps(data)
+        resp = web.Response(body=payload, status=status, content_type="application/json")
+        if len(payload) >= _COMPRESS_MIN_BYTES:
+            resp.enable_compression()
+        return resp
+
     async def invoke_handler(request: web.Request) -> web.Response:
-        body = await request.json()
-        result = await _handle_invoke(body)
-        return web.json_response(result)
+        result = await _handle_invoke_raw(await request.read())
+        return json_response(result)
+
+    async def invoke_batch_handler(request: web.Request) -> web.Response:
+        results = await _handle_invoke_batch_raw(await request.read())
+        return json_response(results)
 
-    async def query_handler(request: web.Request) -> web.Response:
-        body = await request.json()
+    async def query_handler(request: web.Request) -> web.StreamResponse:
+        body = _loads(await request.read())
         result = await _handle_query(body)
-        return web.json_response(result)
+        if len(result) <= _STREAM_MIN_ROWS:
+            return json_response(result)
+
+        # Stream the array a chunk of rows at a time so the encoded body
+        # is never held in memory all at once. The first chunk is encoded
+        # before prepare() so a serialization error still becomes a 500
+        # rather than a truncated 200.
+        chunk = b",".join([_dumps(row) for row in result[:_STREAM_CHUNK_ROWS]])
+        resp = web.StreamResponse(headers={"Content-Type": "application/json"})
+        resp.enable_compression()
+        await resp.prepare(request)
+        await resp.write(b"[" + chunk)
+        for start in range(_STREAM_CHUNK_ROWS, len(result), _STREAM_CHUNK_ROWS):
+            rows = result[start:start + _STREAM_CHUNK_ROWS]
+            await resp.write(b"," + b",".join([_dumps(row) for row in rows]))
+        await resp.write(b"]")
+        await resp.write_eof()
+        return resp
 
     async def health_handler(request: web.Request) -> web.Response:
-        return web.json_response({"healthy": True, "latencyMs": 0})
+        return json_response({"healthy": True, "latencyMs": 0})
 
     app = web.Application()
     app.router.add_post("/invoke", invoke_handler)
+    app.router.add_post("/invoke-batch", invoke_batch_handler)
     app.router.add_post("/query", query_handler)
     app.router.add_get("/health", health_handler)
+    return app
 
-    registered = list(_REGISTRY.keys())
-    print(f"Clef Python SDK v0.1.0")
-    print(f"Serving {len(registered)} concept(s) on {host}:{port}")
-    for uri in registered:
-        print(f"  - {uri}")
 
-    web.run_app(app, host=host, port=port)
+def _serve_stdlib(host: str, port: int) -> None:
+    """Fallback server using stdlib http.server (sync, for testing only).
 
+    Requests are accepted on one thread each, but every handler coroutine
+    runs on a single long-lived event loop, so handlers never run in
+    parallel against the same storage.
+    """
+    import threading
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
-def _serve_stdlib(host: str, port: int) -> None:
-    """Fallback server using stdlib http.server (sync, for testing only)."""
-    import asyncio
-    from http.server import HTTPServer, BaseHTTPRequestHandler
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="clef-loop", daemon=True).start()
+
+    def run(coro: Any) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
 
     class Handler(BaseHTTPRequestHandler):
         def do_POST(self) -> None:
             length = int(self.headers.get("Content-Length", 0))
-            body = json.loads(self.rfile.read(length)) if length > 0 else {}
+            raw = self.rfile.read(length) if length > 0 else b""
 
             if self.path == "/invoke":
-                result = asyncio.run(_handle_invoke(body))
+                result = run(_handle_invoke_raw(raw))
+            elif self.path == "/invoke-batch":
+                result = run(_handle_invoke_batch_raw(raw))
             elif self.path == "/query":
-                result = asyncio.run(_handle_query(body))
+                result = run(_handle_query(_loads(raw) if raw else {}))
             else:
                 self.send_error(404)
                 return
 
-            response = json.dumps(result).encode()
+            response = _dumps(result)
             self.send_response(200)
             self.send_header("Content-Type", "application/json")
             self.send_header("Content-Length", str(len(response)))
@@ -142,7 +318,7 @@ def _serve_stdlib(host: str, port: int) -> None:
 
         def do_GET(self) -> None:
             if self.path == "/health":
-                response = json.dumps({"healthy": True, "latencyMs": 0}).encode()
+                response = _dumps({"healthy": True, "latencyMs": 0})
                 self.send_response(200)
                 self.send_header("Content-Type", "application/json")
                 self.send_header("Content-Length", str(len(response)))
@@ -160,5 +336,9 @@ def _serve_stdlib(host: str, port: int) -> None:
     for uri in registered:
         print(f"  - {uri}")
 
-    server = HTTPServer((host, port), Handler)
-    server.serve_forever()
+    server = ThreadingHTTPServer((host, port), Handler)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        loop.call_soon_threadsafe(loop.stop)
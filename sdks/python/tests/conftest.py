@@ -0,0 +1,22 @@
+"""
+Shared fixtures for the Clef Python SDK tests.
+
+One event loop serves the whole session; tests drive coroutines through
+the `run` fixture instead of building a fresh loop per asyncio.run call.
+"""
+
+import asyncio
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def run(loop):
+    return loop.run_until_complete
@@ -5,14 +5,17 @@ Covers:
   - ConceptHandler dispatch
   - InMemoryStorage contract
   - Registry decorator
+  - Transport invocation decoding and query responses
 """
 
-import asyncio
+import gzip
+
 import pytest
 
 from clef.handler import ConceptHandler
 from clef.storage import InMemoryStorage
 from clef.registry import register, _REGISTRY
+from clef import transport
 
 
 # ============================================================
@@ -30,35 +33,106 @@ class EchoHandler(ConceptHandler):
     def not_async(self, input: dict, storage) -> dict:
         return {"variant": "ok"}
 
+    async def no_variant(self, input: dict, storage) -> dict:
+        return {"message": "forgot the variant"}
+
+    async def explode(self, input: dict, storage) -> dict:
+        return {"variant": "ok", "value": input["missing"]}
 
-def test_handler_dispatches_to_correct_method():
+
+def test_handler_dispatches_to_correct_method(run):
     handler = EchoHandler()
     storage = InMemoryStorage()
-    result = asyncio.run(handler.handle("echo", {"message": "hello"}, storage))
+    result = run(handler.handle("echo", {"message": "hello"}, storage))
     assert result["variant"] == "ok"
     assert result["message"] == "hello"
 
 
-def test_handler_returns_error_for_unknown_action():
+def test_handler_returns_error_for_unknown_action(run):
     handler = EchoHandler()
     storage = InMemoryStorage()
-    result = asyncio.run(handler.handle("nonexistent", {}, storage))
+    result = run(handler.handle("nonexistent", {}, storage))
     assert result["variant"] == "error"
     assert "Unknown action" in result["message"]
 
 
-def test_handler_returns_error_for_non_async_method():
+def test_handler_returns_error_for_non_async_method(run):
     handler = EchoHandler()
     storage = InMemoryStorage()
-    result = asyncio.run(handler.handle("not_async", {}, storage))
+    result = run(handler.handle("not_async", {}, storage))
     assert result["variant"] == "error"
     assert "must be async" in result["message"]
 
 
-def test_handler_passes_through_error_variant():
+def test_handler_returns_error_for_result_without_variant(run):
+    handler = EchoHandler()
+    storage = InMemoryStorage()
+    result = run(handler.handle("no_variant", {}, storage))
+    assert result["variant"] == "error"
+    assert "'variant' key" in result["message"]
+
+
+def test_handler_dispatches_inherited_actions_only_for_public_names(run):
+    class LoudEchoHandler(EchoHandler):
+        async def shout(self, input: dict, storage) -> dict:
+            return {"variant": "ok", "message": input["message"].upper()}
+
+        async def _helper(self, input: dict, storage) -> dict:
+            return {"variant": "ok"}
+
+    handler = LoudEchoHandler()
+    storage = InMemoryStorage()
+    assert run(handler.handle("echo", {"message": "hi"}, storage))["message"] == "hi"
+    assert run(handler.handle("shout", {"message": "hi"}, storage))["message"] == "HI"
+    for action in ("_helper", "handle"):
+        result = run(handler.handle(action, {}, storage))
+        assert "Unknown action" in result["message"]
+
+
+def test_handler_dispatches_async_actions_added_outside_the_class_body(run):
+    def add_ping(cls):
+        async def ping(self, input: dict, storage) -> dict:
+            return {"variant": "ok", "via": "decorator"}
+
+        cls.ping = ping
+        return cls
+
+    @add_ping
+    class LateHandler(ConceptHandler):
+        @staticmethod
+        async def static_action(input: dict, storage) -> dict:
+            return {"variant": "ok", "via": "staticmethod"}
+
+        @classmethod
+        async def class_action(cls, input: dict, storage) -> dict:
+            return {"variant": "ok", "via": cls.__name__}
+
+    async def patched(self, input: dict, storage) -> dict:
+        return {"variant": "ok", "via": "setattr"}
+
+    LateHandler.patched = patched
+    handler = LateHandler()
+
+    async def instance_action(input: dict, storage) -> dict:
+        return {"variant": "ok", "via": "instance"}
+
+    handler.instance_action = instance_action
+    storage = InMemoryStorage()
+    expected = {
+        "ping": "decorator",
+        "static_action": "staticmethod",
+        "class_action": "LateHandler",
+        "patched": "setattr",
+        "instance_action": "instance",
+    }
+    for action, via in expected.items():
+        assert run(handler.handle(action, {}, storage)) == {"variant": "ok", "via": via}
+
+
+def test_handler_passes_through_error_variant(run):
     handler = EchoHandler()
     storage = InMemoryStorage()
-    result = asyncio.run(handler.handle("fail", {}, storage))
+    result = run(handler.handle("fail", {}, storage))
     assert result["variant"] == "error"
     assert result["message"] == "intentional failure"
 
@@ -68,73 +142,143 @@ def test_handler_passes_through_error_variant():
 # ============================================================
 
 
-def test_storage_put_and_get():
+def test_storage_put_and_get(run):
     storage = InMemoryStorage()
-    asyncio.run(storage.put("users", "alice", {"name": "Alice", "age": 30}))
-    result = asyncio.run(storage.get("users", "alice"))
+    run(storage.put("users", "alice", {"name": "Alice", "age": 30}))
+    result = run(storage.get("users", "alice"))
     assert result is not None
     assert result["name"] == "Alice"
     assert result["age"] == 30
 
 
-def test_storage_get_returns_none_for_missing():
+def test_storage_get_returns_none_for_missing(run):
     storage = InMemoryStorage()
-    result = asyncio.run(storage.get("users", "nonexistent"))
+    result = run(storage.get("users", "nonexistent"))
     assert result is None
 
 
-def test_storage_put_overwrites():
+def test_storage_put_overwrites(run):
     storage = InMemoryStorage()
-    asyncio.run(storage.put("users", "alice", {"v": 1}))
-    asyncio.run(storage.put("users", "alice", {"v": 2}))
-    result = asyncio.run(storage.get("users", "alice"))
+    run(storage.put("users", "alice", {"v": 1}))
+    run(storage.put("users", "alice", {"v": 2}))
+    result = run(storage.get("users", "alice"))
     assert result["v"] == 2
 
 
-def test_storage_delete():
+def test_storage_delete(run):
     storage = InMemoryStorage()
-    asyncio.run(storage.put("users", "alice", {"name": "Alice"}))
-    deleted = asyncio.run(storage.delete("users", "alice"))
+    run(storage.put("users", "alice", {"name": "Alice"}))
+    deleted = run(storage.delete("users", "alice"))
     assert deleted is True
-    result = asyncio.run(storage.get("users", "alice"))
+    result = run(storage.get("users", "alice"))
     assert result is None
 
 
-def test_storage_delete_returns_false_for_missing():
+def test_storage_delete_returns_false_for_missing(run):
     storage = InMemoryStorage()
-    deleted = asyncio.run(storage.delete("users", "nonexistent"))
+    deleted = run(storage.delete("users", "nonexistent"))
     assert deleted is False
 
 
-def test_storage_find_all():
+def test_storage_find_all(run):
     storage = InMemoryStorage()
-    asyncio.run(storage.put("users", "alice", {"name": "Alice", "role": "admin"}))
-    asyncio.run(storage.put("users", "bob", {"name": "Bob", "role": "user"}))
-    results = asyncio.run(storage.find("users"))
+    run(storage.put("users", "alice", {"name": "Alice", "role": "admin"}))
+    run(storage.put("users", "bob", {"name": "Bob", "role": "user"}))
+    results = run(storage.find("users"))
     assert len(results) == 2
 
 
-def test_storage_find_with_filter():
+def test_storage_find_with_filter(run):
     storage = InMemoryStorage()
-    asyncio.run(storage.put("users", "alice", {"name": "Alice", "role": "admin"}))
-    asyncio.run(storage.put("users", "bob", {"name": "Bob", "role": "user"}))
-    admins = asyncio.run(storage.find("users", {"role": "admin"}))
+    run(storage.put("users", "alice", {"name": "Alice", "role": "admin"}))
+    run(storage.put("users", "bob", {"name": "Bob", "role": "user"}))
+    admins = run(storage.find("users", {"role": "admin"}))
     assert len(admins) == 1
     assert admins[0]["name"] == "Alice"
 
 
-def test_storage_find_empty_relation():
+def test_storage_find_with_multiple_filters(run):
+    storage = InMemoryStorage()
+    run(storage.put("users", "alice", {"name": "Alice", "role": "admin", "team": "a"}))
+    run(storage.put("users", "bob", {"name": "Bob", "role": "admin", "team": "b"}))
+    run(storage.put("users", "carol", {"name": "Carol", "role": "user", "team": "a"}))
+    results = run(storage.find("users", {"role": "admin", "team": "a"}))
+    assert [r["name"] for r in results] == ["Alice"]
+    assert run(storage.find("users", {"role": "admin", "team": "c"})) == []
+    assert run(storage.find("users", {"missing": "x"})) == []
+    run(storage.put("users", "dave", {"name": "Dave", "role": "admin", "team": "a"}))
+    run(storage.put("users", "erin", {"name": "Erin", "role": "admin", "team": "a"}))
+    results = run(storage.find("users", {"role": "admin", "team": "a"}))
+    assert [r["name"] for r in results] == ["Alice", "Dave", "Erin"]
+
+
+def test_storage_find_keeps_insertion_order(run):
+    storage = InMemoryStorage()
+    for i in range(300):
+        run(storage.put("rows", str(i), {"g": i % 3, "n": i}))
+    assert [r["n"] for r in run(storage.find("rows", {"g": 0}))] == list(range(0, 300, 3))
+    # Overwriting keeps a key's original position, as in the relation itself
+    run(storage.put("rows", "1", {"g": 0, "n": 1}))
+    assert [r["n"] for r in run(storage.find("rows", {"g": 0}))][:3] == [0, 1, 3]
+
+
+def test_storage_find_reflects_overwrite_and_delete(run):
     storage = InMemoryStorage()
-    results = asyncio.run(storage.find("empty"))
+    run(storage.put("users", "alice", {"role": "admin"}))
+    run(storage.put("users", "alice", {"role": "user"}))
+    assert run(storage.find("users", {"role": "admin"})) == []
+    assert len(run(storage.find("users", {"role": "user"}))) == 1
+    run(storage.delete("users", "alice"))
+    assert run(storage.find("users", {"role": "user"})) == []
+
+
+def test_storage_find_after_in_place_edit_and_put(run):
+    storage = InMemoryStorage()
+    run(storage.put("users", "alice", {"role": "admin"}))
+    record = run(storage.get("users", "alice"))
+    record["role"] = "user"
+    run(storage.put("users", "alice", record))
+    assert run(storage.find("users", {"role": "admin"})) == []
+    assert run(storage.find("users", {"role": "user"})) == [{"role": "user"}]
+    record["role"] = "guest"
+    run(storage.delete("users", "alice"))
+    assert run(storage.find("users", {"role": "user"})) == []
+
+
+def test_storage_find_with_unhashable_and_none_filters(run):
+    storage = InMemoryStorage()
+    run(storage.put("posts", "p1", {"tags": ["a", "b"], "author": "alice"}))
+    run(storage.put("posts", "p2", {"tags": ["c"]}))
+    tagged = run(storage.find("posts", {"tags": ["a", "b"]}))
+    assert len(tagged) == 1
+    assert tagged[0]["author"] == "alice"
+    anonymous = run(storage.find("posts", {"author": None}))
+    assert anonymous == [{"tags": ["c"]}]
+
+
+def test_storage_sync_variants_share_state_with_async_api(run):
+    storage = InMemoryStorage()
+    storage.put_sync("users", "alice", {"name": "Alice", "role": "admin"})
+    assert run(storage.get("users", "alice"))["name"] == "Alice"
+    run(storage.put("users", "bob", {"name": "Bob", "role": "admin"}))
+    assert len(storage.find_sync("users", {"role": "admin"})) == 2
+    assert storage.delete_sync("users", "bob") is True
+    assert storage.get_sync("users", "bob") is None
+    assert storage.delete_sync("users", "bob") is False
+
+
+def test_storage_find_empty_relation(run):
+    storage = InMemoryStorage()
+    results = run(storage.find("empty"))
     assert results == []
 
 
-def test_storage_isolates_relations():
+def test_storage_isolates_relations(run):
     storage = InMemoryStorage()
-    asyncio.run(storage.put("users", "k1", {"type": "user"}))
-    asyncio.run(storage.put("posts", "k1", {"type": "post"}))
-    users = asyncio.run(storage.find("users"))
-    posts = asyncio.run(storage.find("posts"))
+    run(storage.put("users", "k1", {"type": "user"}))
+    run(storage.put("posts", "k1", {"type": "post"}))
+    users = run(storage.find("users"))
+    posts = run(storage.find("posts"))
     assert len(users) == 1
     assert users[0]["type"] == "user"
     assert len(posts) == 1
@@ -174,5 +318,187 @@ def test_register_with_custom_storage():
     assert registered_storage is custom_storage
 
 
+# ============================================================
+# Transport Tests
+# ============================================================
+
+
+@pytest.fixture
+def echo_concept():
+    _REGISTRY.clear()
+    _REGISTRY["urn:test/Echo"] = (EchoHandler(), InMemoryStorage())
+    yield "urn:test/Echo"
+    _REGISTRY.clear()
+
+
+@pytest.fixture(params=["msgspec", "fallback"])
+def decode_path(request, monkeypatch):
+    if request.param == "msgspec":
+        if transport._INVOCATION_DECODER is None:
+            pytest.skip("msgspec not installed")
+    else:
+        monkeypatch.setattr(transport, "_INVOCATION_DECODER", None)
+        monkeypatch.setattr(transport, "_INVOCATION_LIST_DECODER", None)
+    return request.param
+
+
+def test_invoke_raw_treats_null_fields_as_missing(run, echo_concept, decode_path):
+    raw = b'{"concept": "urn:test/Echo", "action": "echo", "input": null, "flow": null, "id": null}'
+    result = run(transport._handle_invoke_raw(raw))
+    assert result["variant"] == "ok"
+    assert result["input"] == {}
+    assert result["output"]["message"] == ""
+    assert result["flow"]
+    assert result["id"]
+
+
+def test_invoke_raw_mints_ids_only_when_missing_or_empty(run, echo_concept, decode_path):
+    raw = b'{"concept": "urn:test/Echo", "action": "echo", "flow": "", "id": "inv-1"}'
+    result = run(transport._handle_invoke_raw(raw))
+    assert result["id"] == "inv-1"
+    assert result["flow"] not in ("", None)
+
+
+def test_invoke_batch_returns_completions_in_input_order(run, echo_concept, decode_path):
+    raw = b"""[
+        {"concept": "urn:test/Echo", "action": "echo", "input": {"message": "a"}, "id": "1"},
+        {"concept": "urn:test/Echo", "action": "echo", "input": {"message": "b"}, "id": "2"},
+        {"concept": "urn:test/Echo", "action": "echo", "input": {"message": "c"}, "id": "3"}
+    ]"""
+    results = run(transport._handle_invoke_batch_raw(raw))
+    assert [r["id"] for r in results] == ["1", "2", "3"]
+    assert [r["output"]["message"] for r in results] == ["a", "b", "c"]
+
+
+def test_invoke_batch_isolates_unknown_concept(run, echo_concept, decode_path):
+    raw = b"""[
+        {"concept": "urn:test/Echo", "action": "echo", "input": {"message": "a"}},
+        {"concept": "urn:test/Missing", "action": "echo"}
+    ]"""
+    ok, missing = run(transport._handle_invoke_batch_raw(raw))
+    assert ok["variant"] == "ok"
+    assert missing["variant"] == "error"
+    assert "Unknown concept" in missing["output"]["message"]
+
+
+def test_invoke_batch_isolates_raising_action(run, echo_concept, decode_path):
+    raw = b"""[
+        {"concept": "urn:test/Echo", "action": "echo", "input": {"message": "a"}, "id": "1"},
+        {"concept": "urn:test/Echo", "action": "explode", "id": "2"},
+        {"concept": "urn:test/Echo", "action": "echo", "input": {"message": "c"}, "id": "3"}
+    ]"""
+    first, failed, last = run(transport._handle_invoke_batch_raw(raw))
+    assert (first["variant"], last["variant"]) == ("ok", "ok")
+    assert failed["id"] == "2"
+    assert failed["variant"] == "error"
+    assert "KeyError" in failed["output"]["message"]
+
+
+def test_invoke_raw_propagates_handler_exceptions(run, echo_concept, decode_path):
+    raw = b'{"concept": "urn:test/Echo", "action": "explode"}'
+    with pytest.raises(KeyError):
+        run(transport._handle_invoke_raw(raw))
+
+
+def test_invoke_batch_empty_body(run, decode_path):
+    assert run(transport._handle_invoke_batch_raw(b"")) == []
+
+
+def test_invoke_decoders_agree_with_loads_fallback(run, echo_concept, monkeypatch):
+    if transport._INVOCATION_DECODER is None:
+        pytest.skip("msgspec not installed")
+    single = b'{"concept": "urn:test/Echo", "action": "echo", "input": null, "flow": "f", "id": "1"}'
+    batch = b"""[
+        {"concept": "urn:test/Echo", "action": "echo", "input": {"message": "a"}, "flow": "f", "id": "2"},
+        {"concept": "urn:test/Missing", "action": "nope", "flow": "f", "id": "3"},
+        {"concept": "urn:test/Echo", "action": "echo", "flow": 7, "id": 123},
+        {"concept": "urn:test/Missing", "action": "nope", "input": [1], "flow": "f", "id": 4.5}
+    ]"""
+
+    def invoke_all():
+        completions = [run(transport._handle_invoke_raw(single))]
+        completions += run(transport._handle_invoke_batch_raw(batch))
+        for completion in completions:
+            del completion["timestamp"]
+        return completions
+
+    with_msgspec = invoke_all()
+    monkeypatch.setattr(transport, "_INVOCATION_DECODER", None)
+    monkeypatch.setattr(transport, "_INVOCATION_LIST_DECODER", None)
+    assert invoke_all() == with_msgspec
+
+
+
+def _post_query(run, body, headers=None):
+    """POST body to /query on the aiohttp app; returns (status, headers, raw body)."""
+    test_utils = pytest.importorskip("aiohttp.test_utils")
+
+    async def go():
+        async with test_utils.TestClient(test_utils.TestServer(transport._create_app())) as client:
+            # auto_decompress=False so the assertions see what went on the wire
+            resp = await client.post("/query", json=body, headers=headers or {}, auto_decompress=False)
+            return resp.status, resp.headers, await resp.read()
+
+    return run(go())
+
+
+def _fill(concept, rows):
+    _, storage = _REGISTRY[concept]
+    for i in range(rows):
+        storage.put_sync("items", f"k{i}", {"n": i, "label": f"item-{i}"})
+    return [{"n": i, "label": f"item-{i}"} for i in range(rows)]
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_query_streams_large_results_across_chunks(run, echo_concept, compressed):
+    rows = transport._STREAM_CHUNK_ROWS * 2 + 1
+    expected = _fill(echo_concept, rows)
+    headers = {"Accept-Encoding": "gzip" if compressed else "identity"}
+    status, resp_headers, raw = _post_query(
+        run, {"concept": echo_concept, "relation": "items"}, headers,
+    )
+
+    assert status == 200
+    assert "Content-Length" not in resp_headers
+    if compressed:
+        assert resp_headers["Content-Encoding"] == "gzip"
+        raw = gzip.decompress(raw)
+    else:
+        assert "Content-Encoding" not in resp_headers
+    assert transport._loads(raw) == expected
+
+
+def test_query_buffers_small_results(run, echo_concept):
+    expected = _fill(echo_concept, transport._STREAM_MIN_ROWS)
+    status, resp_headers, raw = _post_query(
+        run, {"concept": echo_concept, "relation": "items"}, {"Accept-Encoding": "gzip"},
+    )
+
+    assert status == 200
+    assert "Content-Length" in resp_headers
+    assert resp_headers["Content-Encoding"] == "gzip"
+    assert transport._loads(gzip.decompress(raw)) == expected
+
+
+def test_query_skips_compression_for_tiny_responses(run, echo_concept):
+    expected = _fill(echo_concept, 1)
+    status, resp_headers, raw = _post_query(
+        run, {"concept": echo_concept, "relation": "items"}, {"Accept-Encoding": "gzip"},
+    )
+
+    assert status == 200
+    assert len(raw) < transport._COMPRESS_MIN_BYTES
+    assert "Content-Encoding" not in resp_headers
+    assert transport._loads(raw) == expected
+
+
+def test_query_serialization_error_is_500_when_streaming(run, echo_concept):
+    _fill(echo_concept, transport._STREAM_MIN_ROWS + 1)
+    _, storage = _REGISTRY[echo_concept]
+    storage.put_sync("items", "k0", {"n": 0, "tags": {"not", "json"}})
+    status, _, _ = _post_query(run, {"concept": echo_concept, "relation": "items"})
+
+    assert status == 500
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])